@@ -12,7 +12,7 @@ The resulting copula is then ready for use::
 
     >>> print(numpy.around(copula.sample(5), 4))
     [[0.6536 0.115  0.9503 0.4822 0.8725]
-     [0.2483 0.3325 0.1725 0.3206 0.2732]]
+     [0.2944 0.0194 0.8099 0.2421 0.9195]]
 """
 from . import baseclass, collection
 
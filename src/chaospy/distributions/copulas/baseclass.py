@@ -34,10 +34,22 @@ formula provided by Nelsen 1999.
 .. cite:: nelsen_introduction_1999
 
 The definition of the Rosenblatt transform can require multiple
-differentiations.  An analytical formulation is usually not feasible, so the
-expressions are estimated using difference scheme similar to the one outlined
-for probability density function defined in :ref:`distributions`. The accurate
-might therefore be affected.
+differentiations.  Since :math:`\phi^{[-1]}` is the only part of the copula
+that is differentiated more than once, the transformation simplifies to:
+
+.. math::
+
+    F_{U_i\mid U_0,\dots,U_{i-1}}(u_i\mid u_0,\dots,u_{i-1}) =
+    \frac{\tfrac{\partial^i}{\partial t^i} \phi^{[-1]}(
+        \phi(u_0)+\dots+\phi(u_i))}{
+    \tfrac{\partial^i}{\partial t^i} \phi^{[-1]}(
+        \phi(u_0)+\dots+\phi(u_{i-1}))}
+
+For the copulas in the collection, closed form expression of these
+derivatives are provided. For other Archimedean copulas, the expressions are
+estimated using difference scheme similar to the one outlined for probability
+density function defined in :ref:`distributions`. The accurate might therefore
+be affected.
 
 Since copulas are meant as a replacement for Rosenblatt
 transformation, it is usually assumed that the distribution it is
@@ -46,10 +58,17 @@ However in the definition of a copula does not actually require it, and sine
 the Rosenblatt transformation allows for it, multiple copulas can be stacked
 together in `chaospy`.
 """
+import itertools
+
 import numpy
 
 from .. import Dist
 
+# distance kept to the support boundary when evaluating the generator, as
+# the generator is infinite at 0 and the closed form ratios become 0/0 or
+# inf/inf at the boundary.
+_TINY = 1e-12
+
 
 class Copula(Dist):
 
@@ -76,96 +95,182 @@ class Copula(Dist):
 
     def _pdf(self, x, graph):
         dist, trans = graph.dists["dist"], graph.dists["trans"]
-        return graph(graph.fwd_as_pdf(x, dist), trans)*graph(x, dist)
+        out = graph(graph.fwd_as_pdf(x, dist), trans)
+        out *= graph(x, dist)
+        return out
 
 
 class Archimedean(Dist):
     """
     Archimedean copula superclass.
 
-    Subset this to generate an archimedean.
+    Subset this to generate an archimedean. The generator and its inverse
+    are provided through ``gen(x, th)`` and ``igen(x, th)``. To get closed
+    form expressions, also provide the derivatives ``gen_diff(x, th)`` and
+    ``igen_diff(x, th, order)``.
     """
 
     def _ppf(self, x, th, eps):
 
         for i in range(1, len(x)):
 
-            q = x[:i+1].copy()
-            lo, up = 0,1
-            dq = numpy.zeros(i+1)
-            dq[i] = eps
-            flo, fup = -q[i],1-q[i]
-
-            for iteration in range(1, 10):
-                fq = self._diff(q[:i+1], th, eps)
-                dfq = self._diff((q[:i+1].T+dq).T, th, eps)
-                dfq = (dfq-fq)/eps
-                dfq = numpy.where(dfq==0, numpy.inf, dfq)
-
-                fq = fq-x[i]
-                if not numpy.any(numpy.abs(fq)>eps):
+            # solve in place, as only row i changes
+            size = x.shape[1]
+            target = x[i].copy()
+            lo, up = numpy.zeros(size), numpy.ones(size)
+            flo, fup = -target, 1-target
+            side = numpy.zeros(size, dtype=int)
+            active = numpy.arange(size)
+
+            if hasattr(self, "igen_diff"):
+                # dimensions before i stay fixed during the iteration
+                head = numpy.sum(self.gen(
+                    numpy.clip(x[:i], _TINY, 1-_TINY), th), 0)
+                denominator = self.igen_diff(head, th, i)
+                diff = lambda idx: self.igen_diff(head[idx]+self.gen(
+                    numpy.clip(x[i, idx], _TINY, 1-_TINY), th),
+                    th, i)/denominator[idx]
+            else:
+                diff = lambda idx: self._diff(x[:i+1, idx], th, eps)
+
+            for iteration in range(30):
+
+                # Illinois variant of the false position method
+                x[i, active] = q_ = (lo*fup-up*flo)/(fup-flo)
+                fq = diff(active)-target
+
+                # only keep iterating samples not yet converged, NaN
+                # residuals included
+                unconverged = ~(numpy.abs(fq)<=eps)
+                if not numpy.any(unconverged):
                     break
+                active, target = active[unconverged], target[unconverged]
+                fq, q_ = fq[unconverged], q_[unconverged]
+                lo, up = lo[unconverged], up[unconverged]
+                flo, fup = flo[unconverged], fup[unconverged]
+                side = side[unconverged]
+
+                # a NaN residual gives no direction, so cut the bracket at
+                # the nearest end and bisect what is left
+                invalid = numpy.isnan(fq)
+                if numpy.any(invalid):
+                    near_up = invalid*(up-q_<q_-lo)
+                    lo = numpy.where(invalid*~near_up, q_, lo)
+                    up = numpy.where(near_up, q_, up)
+                    flo = numpy.where(invalid, -1., flo)
+                    fup = numpy.where(invalid, 1., fup)
+                    side = numpy.where(invalid, 0, side)
+
+                # reduce boundaries, and halve the weight of the boundary
+                # that has been kept twice in a row
+                upper = fq>0
+                lower = ~upper*~invalid
+                flo = numpy.where(upper*(side==1), .5*flo, flo)
+                fup = numpy.where(lower*(side==-1), .5*fup, fup)
+                lo, flo = numpy.where(lower, q_, lo), numpy.where(lower, fq, flo)
+                up, fup = numpy.where(upper, q_, up), numpy.where(upper, fq, fup)
+                side = numpy.where(upper, 1, numpy.where(lower, -1, side))
 
-                # reduce boundaries
-                flo = numpy.where(fq<=0, fq, flo)
-                lo = numpy.where(fq<=0, q[i], lo)
-
-                fup = numpy.where(fq>=0, fq, fup)
-                up = numpy.where(fq>=0, q[i], up)
-
-                # Newton increment
-                qdq = q[i]-fq/dfq
-
-                # if new val on interior use Newton
-                # else binary search
-                q[i] = numpy.where((qdq<up)*(qdq>lo),
-                        qdq, .5*(up+lo))
-
-            x[i] = q[i]
         return x
 
 
     def _cdf(self, x, th, eps):
         out = numpy.zeros(x.shape)
         out[0] = x[0]
-        for i in range(1,len(x)):
-            out[i][x[i]==1] = 1
-            out[i] = self._diff(x[:i+1], th, eps)
 
-        return out
+        if not hasattr(self, "igen_diff"):
+            for i in range(1,len(x)):
+                out[i] = self._diff(x[:i+1], th, eps)
+            return numpy.clip(out, 0, 1, out=out)
+
+        # generator sums are shared between all dimensions
+        x = numpy.clip(x, _TINY, 1-_TINY)
+        gen = numpy.cumsum(self.gen(x, th), 0)
+        for i in range(1, len(x)):
+            out[i] = self.igen_diff(gen[i], th, i)
+            out[i] /= self.igen_diff(gen[i-1], th, i)
+
+        # the ratio can round to just outside the unit interval
+        return numpy.clip(out, 0, 1, out=out)
 
     def _pdf(self, x, th, eps):
         out = numpy.ones(x.shape)
-        sign = 1-2*(x>.5)
-        for i in range(1,len(x)):
-            x[i] += eps*sign[i]
-            out[i] = self._diff(x[:i+1], th, eps)
-            x[i] -= eps*sign[i]
-            out[i] -= self._diff(x[:i+1], th, eps)
-            out[i] /= eps
-
-        out = abs(out)
+
+        if not hasattr(self, "igen_diff"):
+            for i in range(1,len(x)):
+
+                # the density is a difference of order i+1 of the copula, so
+                # the step grows with the order to limit the cancellation
+                step = max(eps, numpy.finfo(float).eps**(1./(i+2)))
+
+                # centered difference, with the stencil kept inside [0, 1]
+                x_ = x[:i+1].copy()
+                lo = x_[i] = numpy.clip(x[i]-step, 0, 1)
+                out[i] = -self._diff(x_, th, step)
+                up = x_[i] = numpy.clip(x[i]+step, 0, 1)
+                out[i] += self._diff(x_, th, step)
+                out[i] /= up-lo
+
+            # remaining rounding can still push the estimate below zero
+            return numpy.clip(out, 0, None, out=out)
+
+        x = numpy.clip(x, _TINY, 1-_TINY)
+        gen = numpy.cumsum(self.gen(x, th), 0)
+        gen_diff = self.gen_diff(x, th)
+        for i in range(1, len(x)):
+            out[i] = self.igen_diff(gen[i], th, i+1)*gen_diff[i]
+
+            # far out in the tail both factors can underflow to zero, which
+            # happens where the density vanishes
+            denominator = self.igen_diff(gen[i-1], th, i)
+            out[i] /= numpy.where(denominator == 0, numpy.inf, denominator)
+
         return out
 
     def _diff(self, x, th, eps):
         """
         Differentiation function.
 
+        Rosenblatt transformation created from copula formulation. If the
+        copula provides the derivatives of the generator inverse through
+        ``igen_diff(x, th, order)``, the closed form expression is used.
+        Otherwise fall back to a numerical approximation.
+        """
+        x = numpy.clip(x, _TINY, 1-_TINY)
+        if not hasattr(self, "igen_diff"):
+            return self._diff_numeric(x, th, eps)
+
+        gen = self.gen(x, th)
+        order = len(x)-1
+        out = self.igen_diff(numpy.sum(gen, 0), th, order)
+        out /= self.igen_diff(numpy.sum(gen[:-1], 0), th, order)
+        return out
+
+    def _diff_numeric(self, x, th, eps):
+        """
         Numerical approximation of a Rosenblatt transformation created from
         copula formulation.
         """
-        foo = lambda y: self.igen(numpy.sum(self.gen(y, th), 0), th)
-
-        out1 = out2 = 0.
-        sign = 1 - 2*(x>.5).T
-        for I in numpy.ndindex(*((2,)*(len(x)-1)+(1,))):
-
-            eps_ = numpy.array(I)*eps
-            x_ = (x.T + sign*eps_).T
-            out1 += (-1)**sum(I)*foo(x_)
-
-            x_[-1] = 1
-            out2 += (-1)**sum(I)*foo(x_)
+        gen, igen = self.gen, self.igen
+
+        # each dimension is either shifted or not in a stencil corner, so
+        # the generator only has to be evaluated twice per dimension.
+        # In the denominator the last dimension is 1, where the generator
+        # is zero.
+        sign = 1 - 2*(x[:-1]>.5)
+        gen_base = gen(x[:-1], th)
+        gen_step = gen(x[:-1]+sign*eps, th)
+        gen_last = gen(x[-1], th)
+
+        corners = numpy.array(list(
+            itertools.product([False, True], repeat=len(x)-1)))
+        signs = 1 - 2*(numpy.sum(corners, 1) % 2)
+
+        # all stencil corners evaluated at once along a new first axis
+        head = numpy.sum(numpy.where(
+            corners[:, :, numpy.newaxis], gen_step, gen_base), 1)
+        out1 = numpy.dot(signs, igen(head+gen_last, th))
+        out2 = numpy.dot(signs, igen(head, th))
 
         out = out1/out2
         return out
@@ -1,20 +1,57 @@
 import numpy
-from scipy import special
+from numpy.polynomial import polynomial
+from scipy import linalg, special
+from scipy.linalg import blas
 
 from .baseclass import Archimedean, Copula
 from ..baseclass import Dist
 
 
+_POLYLOG_COEFFICIENTS = [numpy.array([0., 1.])]
+
+
+def _polylog_coefficients(order):
+    """
+    Polynomial coefficients of the polylogarithm ``Li_{-order}(z)``.
+
+    The polynomial is in the variable ``w = z/(1-z)``, ordered from lowest to
+    highest power, and follows from ``Li_{-n-1}(z) = z d/dz Li_{-n}(z)`` and
+    ``z d/dz w = w + w^2``. Coefficients are cached between calls.
+    """
+    while len(_POLYLOG_COEFFICIENTS) <= order:
+        _POLYLOG_COEFFICIENTS.append(polynomial.polymul(
+            polynomial.polyder(_POLYLOG_COEFFICIENTS[-1]), [0., 1., 1.]))
+    return _POLYLOG_COEFFICIENTS[order]
+
+
 class gumbel(Archimedean):
     "Gumbel copula backend"
 
     def __init__(self, N, theta=1., eps=1e-6):
         theta = float(theta)
+        self._inv_th = 1./theta
+        self._coefficients = [numpy.array([1.])]
         Dist.__init__(self, th=theta, eps=eps, _length=N)
     def gen(self, x, th):
         return (-numpy.log(x))**th
+    def gen_diff(self, x, th):
+        "Derivative of ``gen``."
+        return -th*(-numpy.log(x))**(th-1)/x
     def igen(self, x, th):
-        return numpy.e**(-x**th)
+        return numpy.exp(-x**self._inv_th)
+    def igen_diff(self, x, th, order):
+        "Derivative of ``igen`` of given order."
+        alpha = self._inv_th
+        coefficients = self._coefficients
+        while len(coefficients) <= order:
+            k = len(coefficients)-1
+            coefs = numpy.zeros(k+2)
+            coefs[:-1] += coefficients[k]*(alpha*numpy.arange(k+1)-k)
+            coefs[1:] -= coefficients[k]*alpha
+            coefficients.append(coefs)
+        x_alpha = x**alpha
+        return numpy.exp(-x_alpha)*polynomial.polyval(
+            x_alpha, coefficients[order])*x**-order
 
 
 def Gumbel(dist, theta=2., eps=1e-6):
@@ -22,8 +59,8 @@ def Gumbel(dist, theta=2., eps=1e-6):
     Gumbel Copula
 
     .. math::
-        \phi(x;th) = \frac{x^{-th}-1}{th}
-        \phi^{-1}(q;th) = (q*th + 1)^{-1/th}
+        \phi(x;th) = (-\log(x))^{th}
+        \phi^{-1}(q;th) = e^{-q^{1/th}}
 
     where `th` (or theta) is defined on the interval `[1,inf)`.
 
@@ -37,9 +74,9 @@ Returns:
 Examples:
     >>> dist = chaospy.J(chaospy.Uniform(), chaospy.Normal())
     >>> copula = chaospy.Gumbel(dist, theta=2)
-    >>> print(copula.sample(3, "H"))
-    [[ 0.125       0.625       0.375     ]
-     [ 0.62638094 -0.45417192 -0.21628863]]
+    >>> print(numpy.around(copula.sample(3, "H"), 4))
+    [[ 0.125   0.625   0.375 ]
+     [-0.8635  0.6569 -0.8124]]
 """
     return Copula(dist, gumbel(len(dist), theta, eps))
 
@@ -48,11 +85,20 @@ class clayton(Archimedean):
     "clayton copula backend"
 
     def __init__(self, N, theta=1., eps=1e-6):
-        Dist.__init__(self, th=float(theta), _length=N, eps=eps)
+        theta = float(theta)
+        self._inv_th = 1./theta
+        Dist.__init__(self, th=theta, _length=N, eps=eps)
     def gen(self, x, th):
-        return (x**-th-1)/th
+        return (x**-th-1)*self._inv_th
+    def gen_diff(self, x, th):
+        "Derivative of ``gen``."
+        return -x**(-th-1)
     def igen(self, x, th):
-        return (1.+th*x)**(-1./th)
+        return (1.+th*x)**-self._inv_th
+    def igen_diff(self, x, th, order):
+        "Derivative of ``igen`` of given order."
+        coef = numpy.prod(1.+th*numpy.arange(order))
+        return (-1)**order*coef*(1.+th*x)**(-self._inv_th-order)
 
 def Clayton(dist, theta=2., eps=1e-6):
     return Copula(dist, clayton(len(dist), theta, eps))
@@ -64,11 +110,23 @@ class ali_mikhail_haq(Archimedean):
     def __init__(self, N, theta=.5, eps=1e-6):
         theta = float(theta)
         assert -1<=theta<1
+        self._one_minus_th = 1-theta
         Dist.__init__(self, th=theta, _length=N, eps=eps)
     def gen(self, x, th):
         return numpy.log((1-th*(1-x))/x)
+    def gen_diff(self, x, th):
+        "Derivative of ``gen``."
+        return -self._one_minus_th/(x*(self._one_minus_th+th*x))
     def igen(self, x, th):
-        return (1-th)/(numpy.e**x-th)
+        return self._one_minus_th/(numpy.exp(x)-th)
+    def igen_diff(self, x, th, order):
+        "Derivative of ``igen`` of given order."
+        exp_x = numpy.exp(-x)
+        z = th*exp_x
+        coefs = _polylog_coefficients(order)[1:]
+        out = self._one_minus_th*exp_x/(1-z)*polynomial.polyval(
+            z/(1-z), coefs)
+        return (-1)**order*out
 
 
 def Ali_mikhail_haq(dist, theta=2., eps=1e-6):
@@ -83,12 +141,24 @@ class frank(Archimedean):
         "theta!=0"
         theta = float(theta)
         assert theta!=0
+        self._inv_th = 1./theta
+        self._em1 = numpy.expm1(-theta)
         Dist.__init__(self, th=theta, _length=N, eps=eps)
 
     def gen(self, x, th):
-        return -numpy.log((numpy.e**(-th*x)-1)/(numpy.e**-th-1))
+        return -numpy.log(numpy.expm1(-th*x)/self._em1)
+    def gen_diff(self, x, th):
+        "Derivative of ``gen``."
+        return -th/numpy.expm1(th*x)
     def igen(self, q, th):
-        return -numpy.log(1+numpy.e**-q*(numpy.e**-th-1))/th
+        return -numpy.log1p(numpy.exp(-q)*self._em1)*self._inv_th
+    def igen_diff(self, q, th, order):
+        "Derivative of ``igen`` of given order."
+        if not order:
+            return self.igen(q, th)
+        z = -self._em1*numpy.exp(-q)
+        coefs = _polylog_coefficients(order-1)
+        return (-1)**order*polynomial.polyval(z/(1-z), coefs)*self._inv_th
 
 def Frank(dist, theta=1., eps=1e-4):
     "Frank copula"
@@ -101,13 +171,37 @@ class joe(Archimedean):
         "theta in [1,inf)"
         theta = float(theta)
         assert theta>=1
+        self._inv_th = 1./theta
+        self._coefficients = [numpy.array([1.])]
         Dist.__init__(self, th=theta, _length=N, eps=eps)
 
     def gen(self, x, th):
-        return -numpy.log(1-(1-x)**th)
+        return -numpy.log1p(-(1-x)**th)
+    def gen_diff(self, x, th):
+        "Derivative of ``gen``."
+        y = (1-x)**th
+        return -th*y/((1-x)*(1-y))
 
     def igen(self, q, th):
-        return 1-(1-numpy.e**-q)**(1/th)
+        return 1-(-numpy.expm1(-q))**self._inv_th
+    def igen_diff(self, q, th, order):
+        "Derivative of ``igen`` of given order."
+        if not order:
+            return self.igen(q, th)
+        # with w = exp(-q) all terms have the same sign; the coefficients
+        # are Stirling numbers of the second kind times |(1/th)_j|.
+        alpha = self._inv_th
+        coefficients = self._coefficients
+        while len(coefficients) <= order:
+            k = len(coefficients)-1
+            coefs = numpy.zeros(k+2)
+            coefs[:-1] += coefficients[k]*numpy.arange(k+1)
+            coefs[1:] += coefficients[k]*numpy.abs(alpha-numpy.arange(k+1))
+            coefficients.append(coefs)
+        w = numpy.exp(-q)
+        y = -numpy.expm1(-q)
+        return (-1)**order*y**alpha*polynomial.polyval(
+            w/y, coefficients[order])
 
 def Joe(dist, theta=2., eps=1e-6):
     "Joe copula"
@@ -123,23 +217,30 @@ class nataf(Dist):
             ordering = range(len(R))
         ordering = numpy.array(ordering)
 
-        P = numpy.eye(len(R))[ordering]
-
-        R = numpy.dot(P, numpy.dot(R, P.T))
-        R = numpy.linalg.cholesky(R)
-        R = numpy.dot(P.T, numpy.dot(R, P))
-        Ci = numpy.linalg.inv(R)
-        Dist.__init__(self, C=R, Ci=Ci, _length=len(R))
-
-    def _cdf(self, x, C, Ci):
-        out = special.ndtr(numpy.dot(Ci, special.ndtri(x)))
-        return out
-
-    def _ppf(self, q, C, Ci):
-        out = special.ndtr(numpy.dot(C, special.ndtri(q)))
-        return out
-
-    def _bnd(self, C, Ci):
+        R = numpy.asfarray(R)[numpy.ix_(ordering, ordering)]
+        C = numpy.linalg.cholesky(R)
+        Dist.__init__(self, C=C, ordering=ordering, _length=len(C))
+
+    def _cdf(self, x, C, ordering):
+        out = numpy.empty(x.shape, order="F")
+        numpy.take(numpy.asfarray(x), ordering, axis=0, out=out)
+        special.ndtri(out, out=out)
+        out = linalg.solve_triangular(
+            C, out, lower=True, overwrite_b=True, check_finite=False)
+        x_ = numpy.empty(x.shape)
+        x_[ordering] = out
+        return special.ndtr(x_, out=x_)
+
+    def _ppf(self, q, C, ordering):
+        out = numpy.empty(q.shape, order="F")
+        numpy.take(numpy.asfarray(q), ordering, axis=0, out=out)
+        special.ndtri(out, out=out)
+        out = blas.dtrmm(1., C, out, lower=True, overwrite_b=True)
+        q_ = numpy.empty(q.shape)
+        q_[ordering] = out
+        return special.ndtr(q_, out=q_)
+
+    def _bnd(self, C, ordering):
         return 0.,1.
 
 def Nataf(dist, R, ordering=None):
@@ -150,21 +251,23 @@ def Nataf(dist, R, ordering=None):
 class t_copula(Dist):
 
     def __init__(self, a, R):
-        from ..cores import mvstudentt, student_t
-        self.MV = mvstudentt(a, numpy.zeros(len(R)), R)
-        self.UV = student_t(a)
-        Dist.__init__(self, _length=len(R))
-
-    def _cdf(self, x):
-        out = self.MV.fwd(self.UV.inv(x))
-        return out
-
-    def _ppf(self, q):
-        out = self.MV.inv(q)
-        out = self.UV.fwd(out)
-        return out
-
-    def _bnd(self):
+        C = numpy.linalg.cholesky(R)
+        Dist.__init__(self, a=a, C=C, _length=len(C))
+
+    def _cdf(self, x, a, C):
+        out = numpy.empty(x.shape, order="F")
+        special.stdtrit(a, x, out=out)
+        out = linalg.solve_triangular(
+            C, out, lower=True, overwrite_b=True, check_finite=False)
+        return special.stdtr(a, out, out=out)
+
+    def _ppf(self, q, a, C):
+        out = numpy.empty(q.shape, order="F")
+        special.stdtrit(a, q, out=out)
+        out = blas.dtrmm(1., C, out, lower=True, overwrite_b=True)
+        return special.stdtr(a, out, out=out)
+
+    def _bnd(self, a, C):
         return 0.,1.
 
 def T_copula(dist, a, R):
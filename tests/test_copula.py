@@ -0,0 +1,250 @@
+"""Testing copulas and their transformations
+"""
+import numpy as np
+import chaospy as cp
+
+
+copula_names = ['Gumbel', 'Clayton', 'Ali_mikhail_haq', 'Frank', 'Joe']
+copula_thetas = [1.5, 2.0, 0.5, 2.0, 2.0]
+copulas = [getattr(cp, k) for k in copula_names]
+
+
+def test_copula_analytical_diff():
+
+    dist = cp.Iid(cp.Uniform(), 2)
+    samples = np.random.random((2, 20))*0.8+0.1
+
+    for copula, theta in zip(copulas, copula_thetas):
+        trans = copula(dist, theta).prm["trans"]
+        th, eps = trans.prm["th"], trans.prm["eps"]
+        analytical = trans._diff(samples, th, eps)
+        numerical = trans._diff_numeric(samples, th, eps)
+        np.testing.assert_allclose(analytical, numerical, rtol=1e-3)
+
+
+def test_copula_igen_diff_orders():
+
+    dist = cp.Iid(cp.Uniform(), 2)
+    t = np.linspace(.2, 2., 10)
+    h = 1e-5
+
+    for copula, theta in zip(copulas, copula_thetas):
+        trans = copula(dist, theta).prm["trans"]
+        th = trans.prm["th"]
+        for order in range(1, 6):
+            numerical = (trans.igen_diff(t+h, th, order-1)-
+                         trans.igen_diff(t-h, th, order-1))/(2*h)
+            np.testing.assert_allclose(
+                trans.igen_diff(t, th, order), numerical, rtol=1e-5)
+
+
+def test_copula_coefficient_cache():
+
+    dist = cp.Iid(cp.Uniform(), 2)
+    t = np.linspace(.2, 2., 10)
+
+    for copula, theta in zip([cp.Gumbel, cp.Joe], [1.5, 2.0]):
+
+        # high order first fills the cache that the low order reuses
+        trans = copula(dist, theta).prm["trans"]
+        th = trans.prm["th"]
+        high = trans.igen_diff(t, th, 5)
+        low = trans.igen_diff(t, th, 2)
+        assert len(trans._coefficients) == 6
+
+        reference = copula(dist, theta).prm["trans"]
+        np.testing.assert_allclose(low, reference.igen_diff(t, th, 2))
+        np.testing.assert_allclose(high, reference.igen_diff(t, th, 5))
+        np.testing.assert_allclose(trans.igen_diff(t, th, 5), high)
+
+
+def test_copula_roundtrip():
+
+    dist = cp.Iid(cp.Uniform(), 3)
+    samples = np.random.random((3, 20))*0.8+0.1
+
+    for copula, theta in zip(copulas, copula_thetas):
+        copula = copula(dist, theta)
+        np.testing.assert_allclose(
+            copula.fwd(copula.inv(samples.copy())), samples, atol=1e-4)
+
+
+def test_copula_roundtrip_strong_dependence():
+
+    dist = cp.Iid(cp.Uniform(), 2)
+    samples = np.random.random((2, 1000))
+
+    for copula, theta in zip(copulas, [3.0, 5.0, 0.9, 8.0, 4.0]):
+        copula = copula(dist, theta)
+        np.testing.assert_allclose(
+            copula.fwd(copula.inv(samples.copy())), samples, atol=1e-4)
+
+
+def test_copula_roundtrip_near_one():
+
+    for copula, theta in zip(copulas, [10.0, 10.0, 0.9, 20.0, 10.0]):
+        copula = copula(cp.Iid(cp.Uniform(), 3), theta)
+        samples = 1-10**np.random.uniform(-8, -2, (3, 100))
+        q = copula.fwd(copula.inv(samples.copy()))
+        assert np.all((q >= 0)*(q <= 1))
+        np.testing.assert_allclose(q, samples, atol=1e-4)
+
+    # conditionals that round to just above one without clipping
+    cases = [
+        (cp.Gumbel, 10., [[0.9993570898984998], [0.9999842116584272]]),
+        (cp.Gumbel, 10., [[0.9999356317224681], [0.9999982742149279]]),
+        (cp.Joe, 2., [[6.1e-5], [2.25e-4], [0.99997]]),
+        (cp.Joe, 10., [[0.9993231332363182], [0.9999825898606022]]),
+    ]
+    for copula, theta, samples in cases:
+        copula = copula(cp.Iid(cp.Uniform(), len(samples)), theta)
+        q = copula.fwd(np.array(samples))
+        assert np.all(q <= 1)
+        copula.inv(q)
+
+
+def test_copula_boundary():
+
+    samples = np.array([[0., 1., .3, .3, 0.], [.5, .5, 0., 1., 1.]])
+    for copula, theta in zip(copulas, copula_thetas):
+        copula = copula(cp.Iid(cp.Uniform(), 2), theta)
+        assert np.all(np.isfinite(copula.fwd(samples)))
+        assert np.all(np.isfinite(copula.pdf(samples)))
+        assert np.all(np.isfinite(copula.inv(samples.copy())))
+
+    # densities on the faces of the unit cube at strong dependence
+    samples = np.array([[0., 1., .3, .3, .3, .3, 8.8e-7],
+                        [.5, .5, 0., 1., .6, .6, 4.1e-8],
+                        [.7, .7, .7, .7, 0., 1., 0.]])
+    for copula, theta in zip(copulas, [15.0, 15.0, 0.99, 30.0, 15.0]):
+        for dim in [2, 3]:
+            copula_ = copula(cp.Iid(cp.Uniform(), dim), theta)
+            assert np.all(copula_.pdf(samples[:dim]) >= 0)
+
+    # conditional distribution of the second dimension given u_0 = 0
+    v = .5
+    limits = {
+        'Clayton': 1.,
+        'Ali_mikhail_haq': v/(1-.5*(1-v)),
+        'Frank': np.expm1(-2.*v)/np.expm1(-2.),
+        'Joe': 1-(1-v)**2,
+    }
+    for name, theta in zip(copula_names, copula_thetas):
+        if name not in limits:
+            continue
+        copula = getattr(cp, name)(cp.Iid(cp.Uniform(), 2), theta)
+        np.testing.assert_allclose(
+            copula.fwd([[0.], [v]])[1], limits[name], atol=1e-4)
+
+
+def test_clayton_pdf():
+
+    theta = 2.0
+    dist = cp.Iid(cp.Uniform(), 2)
+    u, v = samples = np.random.random((2, 20))*0.8+0.1
+
+    density = (1+theta)*(u*v)**(-theta-1)*(
+        u**-theta+v**-theta-1)**(-1/theta-2)
+    np.testing.assert_allclose(cp.Clayton(dist, theta).pdf(samples), density)
+
+
+def test_copula_numerical_pdf():
+
+    class plain(cp.distributions.copulas.baseclass.Archimedean):
+        def __init__(self, N, theta, eps=1e-6):
+            cp.distributions.Dist.__init__(
+                self, th=float(theta), eps=eps, _length=N)
+        def gen(self, x, th):
+            return (x**-th-1)/th
+        def igen(self, x, th):
+            return (1.+th*x)**(-1./th)
+
+    for dim in [2, 3]:
+        dist = cp.Iid(cp.Uniform(), dim)
+        samples = np.random.random((dim, 50))*0.8+0.1
+        numerical = cp.distributions.copulas.baseclass.Copula(
+            dist, plain(dim, 2.)).pdf(samples)
+        assert np.all(numerical >= 0)
+        np.testing.assert_allclose(
+            numerical, cp.Clayton(dist, 2.).pdf(samples), rtol=1e-2)
+
+
+def test_copula_generator_at_one():
+
+    thetas = {
+        'Gumbel': np.linspace(1., 10., 50),
+        'Clayton': np.linspace(.1, 10., 50),
+        'Ali_mikhail_haq': np.linspace(-1., .99, 50),
+        'Frank': np.linspace(-10., 10., 50),
+        'Joe': np.linspace(1., 10., 50),
+    }
+    for name, copula in zip(copula_names, copulas):
+        for theta in thetas[name]:
+            dist = cp.Iid(cp.Uniform(), 2)
+            trans = copula(dist, theta).prm["trans"]
+            np.testing.assert_allclose(
+                trans.gen(np.array(1.), trans.prm["th"]), 0, atol=1e-15)
+
+
+def test_copula_inverse_nan_residual():
+
+    class patchy(cp.distributions.copulas.collection.clayton):
+        def gen(self, x, th):
+            out = super(patchy, self).gen(x, th)
+            return np.where((x > .25)*(x < .35), np.nan, out)
+
+    dist = cp.Iid(cp.Uniform(), 2)
+    samples = np.array([[.6, .6], [.5, .9]])
+    copula = cp.Clayton(dist, 2.)
+    patched = cp.distributions.copulas.baseclass.Copula(dist, patchy(2, 2.))
+    np.testing.assert_allclose(
+        patched.inv(copula.fwd(samples)), samples, atol=1e-4)
+
+
+def test_nataf_ordering():
+
+    from scipy import special
+    R = np.array([[1., .5, .2], [.5, 1., .3], [.2, .3, 1.]])
+    ordering = [2, 0, 1]
+    dist = cp.Iid(cp.Uniform(), 3)
+    copula = cp.Nataf(dist, R, ordering=ordering)
+
+    P = np.eye(3)[ordering]
+    C = np.dot(P.T, np.dot(np.linalg.cholesky(np.dot(P, np.dot(R, P.T))), P))
+
+    samples = np.random.random((3, 20))*0.8+0.1
+    np.testing.assert_allclose(copula.fwd(samples), special.ndtr(
+        np.linalg.solve(C, special.ndtri(samples))))
+    np.testing.assert_allclose(copula.inv(samples), special.ndtr(
+        np.dot(C, special.ndtri(samples))))
+    np.testing.assert_allclose(copula.fwd(copula.inv(samples)), samples)
+
+    # boundary samples map to infinities in the normal space, which must
+    # pass through the triangular solve of the last ordered dimension
+    samples = np.array([[.3, .6, .3, .6], [0., 1., 0., 1.], [.5, .5, .2, .2]])
+    interior = samples.copy()
+    interior[1] = .5
+    out = copula.fwd(samples)
+    np.testing.assert_equal(out[1], samples[1])
+    np.testing.assert_allclose(out[[0, 2]], copula.fwd(interior)[[0, 2]])
+
+    # and through the triangular product of the first ordered dimension
+    samples = np.array([[.3, .6, .3, .6], [.5, .5, .2, .2], [0., 1., 0., 1.]])
+    np.testing.assert_equal(copula.inv(samples), samples[[2, 2, 2]])
+
+
+def test_t_copula():
+
+    from scipy import special
+    a = 4.
+    R = np.array([[1., .5, .2], [.5, 1., .3], [.2, .3, 1.]])
+    dist = cp.Iid(cp.Uniform(), 3)
+    copula = cp.T_copula(dist, a, R)
+    C = np.linalg.cholesky(R)
+
+    samples = np.random.random((3, 20))*0.8+0.1
+    np.testing.assert_allclose(copula.fwd(samples), special.stdtr(
+        a, np.linalg.solve(C, special.stdtrit(a, samples))))
+    np.testing.assert_allclose(copula.inv(samples), special.stdtr(
+        a, np.dot(C, special.stdtrit(a, samples))))
+    np.testing.assert_allclose(copula.fwd(copula.inv(samples)), samples)